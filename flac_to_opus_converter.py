@@ -4,48 +4,328 @@ FLAC to Opus Album Converter
 Scans music collection for albums containing FLAC files, allows selection, and converts to Opus format.
 """
 
+import asyncio
 import os
 import subprocess
 import sys
 import argparse
+import itertools
+import re
 from pathlib import Path
-from typing import List, Dict, Set
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Set, Tuple, Iterator, Optional
 import shutil
+import tempfile
+
+# Whether O_TMPFILE outputs can be linked into place; probed on first encode
+_TMPFILE_LINKABLE = None
+
+# Rough size of a 160k Opus file relative to its FLAC source
+OPUS_SIZE_RATIO = 0.35
+
+BYTE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB', 'PB')
+
+# One comma-separated part of an album selection: '7' or '3-7'
+SELECTION_PART = re.compile(r'\s*(\d+)\s*(?:-\s*(\d+))?\s*')
+
+
+def _is_flac(name: str) -> bool:
+    """Check for a .flac extension in any letter case."""
+    return name[-5:].lower() == '.flac'
+
+
+def _open_for_reading(path: str) -> int:
+    """Open a file read-only for a single sequential pass.
+
+    O_NOATIME avoids an inode update for a file that is about to be deleted;
+    it is Linux-only and refused for files we do not own, so fall back to a
+    plain open in those cases.
+    """
+    # O_BINARY keeps Windows from translating line endings in the header read
+    flags = os.O_RDONLY | getattr(os, 'O_BINARY', 0)
+    noatime = getattr(os, 'O_NOATIME', 0)
+    if noatime:
+        try:
+            return os.open(path, flags | noatime)
+        except PermissionError:
+            pass
+    return os.open(path, flags)
+
+
+def _advise(fd: int, advice_name: str) -> None:
+    """Apply posix_fadvise to a whole file where the platform supports it."""
+    advice = getattr(os, advice_name, None)
+    if advice is not None and hasattr(os, 'posix_fadvise'):
+        try:
+            os.posix_fadvise(fd, 0, 0, advice)
+        except OSError:
+            pass
+
+
+def _pick_bitrate(flac_fd: int, default: str) -> str:
+    """Choose an Opus bitrate from the channel count in a FLAC STREAMINFO block.
+
+    Mono gets 96k and multichannel (more than 2) gets 192k; stereo, and any
+    file whose header cannot be parsed, keeps the default. Sample rate is not
+    considered because Opus always encodes at 48 kHz. The descriptor is
+    rewound afterwards so the encoder still reads from the start.
+    """
+    try:
+        # 'fLaC' marker, 4-byte block header, then the 34-byte STREAMINFO
+        header = os.read(flac_fd, 42)
+    finally:
+        os.lseek(flac_fd, 0, os.SEEK_SET)
+    
+    if len(header) < 42 or header[:4] != b'fLaC' or header[4] & 0x7f != 0:
+        return default
+    
+    # Bytes 10-17 of STREAMINFO pack sample rate (20 bits), channels - 1
+    # (3 bits), bits per sample - 1 (5 bits) and total samples (36 bits)
+    packed = int.from_bytes(header[18:26], 'big')
+    channels = ((packed >> 41) & 0x7) + 1
+    
+    if channels == 1:
+        return '96k'
+    if channels > 2:
+        return '192k'
+    return default
+
+
+def _tmpfile_linkable(directory: str) -> bool:
+    """Check once per session whether O_TMPFILE files can be linked into place.
+
+    Linking goes through /proc/self/fd, which some kernels and sandboxes
+    refuse, so the first call tries it with an empty file and caches the result.
+    """
+    global _TMPFILE_LINKABLE
+    if _TMPFILE_LINKABLE is None:
+        _TMPFILE_LINKABLE = False
+        if getattr(os, 'O_TMPFILE', 0) and os.path.isdir('/proc/self/fd'):
+            probe_path = os.path.join(directory, f".opusenc-probe-{os.getpid()}")
+            try:
+                fd = os.open(directory, os.O_TMPFILE | os.O_WRONLY, 0o666)
+                try:
+                    os.link(f"/proc/self/fd/{fd}", probe_path)
+                    os.unlink(probe_path)
+                    _TMPFILE_LINKABLE = True
+                finally:
+                    os.close(fd)
+            except OSError:
+                pass
+    return _TMPFILE_LINKABLE
+
+
+def _open_output(opus_path: str) -> Tuple[int, Optional[str]]:
+    """Open a writable file that only becomes opus_path once committed.
+
+    On Linux this is an anonymous O_TMPFILE in the album directory and the
+    returned partial path is None. Elsewhere, or on filesystems without
+    O_TMPFILE support, it is a hidden partial file next to opus_path (ignored
+    by the scanner), whose path is returned so it can be renamed or removed.
+    """
+    directory, name = os.path.split(opus_path)
+    if _tmpfile_linkable(directory):
+        try:
+            return os.open(directory, os.O_TMPFILE | os.O_WRONLY, 0o666), None
+        except OSError:
+            pass
+    partial_path = os.path.join(directory, f".{name}.partial")
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0)
+    return os.open(partial_path, flags, 0o666), partial_path
+
+
+async def _encode_one(flac_path: str, opus_path: str, bitrate: str,
+                      flags: Tuple[str, ...] = ()) -> Tuple[bool, str]:
+    """Convert a single FLAC file to Opus format.
+
+    bitrate applies to stereo files (see _pick_bitrate) and flags are extra
+    opusenc options. Returns (success, error message). opus_path only appears
+    once the encode has succeeded, so a failure never leaves a partial file.
+    """
+    try:
+        out_fd, partial_path = _open_output(opus_path)
+        try:
+            with tempfile.TemporaryFile() as stderr_file:
+                flac_fd = _open_for_reading(flac_path)
+                try:
+                    _advise(flac_fd, 'POSIX_FADV_SEQUENTIAL')
+                    cmd = [
+                        'opusenc',
+                        '--bitrate', _pick_bitrate(flac_fd, bitrate),
+                        *flags,
+                        '-',
+                        '-'
+                    ]
+                    
+                    process = await asyncio.create_subprocess_exec(
+                        *cmd, stdin=flac_fd, stdout=out_fd, stderr=stderr_file
+                    )
+                    returncode = await process.wait()
+                    
+                    if returncode != 0:
+                        stderr_file.seek(0)
+                        return False, stderr_file.read().decode(errors='replace')
+                finally:
+                    _advise(flac_fd, 'POSIX_FADV_DONTNEED')
+                    os.close(flac_fd)
+            
+            # The new Opus file is not read back either
+            _advise(out_fd, 'POSIX_FADV_DONTNEED')
+            
+            if partial_path is None:
+                # Linking through /proc needs the descriptor still open
+                os.link(f"/proc/self/fd/{out_fd}", opus_path)
+            else:
+                # Windows cannot rename a file that is still open
+                os.close(out_fd)
+                out_fd = None
+                os.replace(partial_path, opus_path)
+                partial_path = None
+        finally:
+            if out_fd is not None:
+                os.close(out_fd)
+            if partial_path is not None:
+                try:
+                    os.unlink(partial_path)
+                except OSError:
+                    pass
+        
+        return True, ''
+        
+    except Exception as e:
+        return False, f"{type(e).__name__}: {e}"
+
+
+def _scan_directory(directory: str) -> Tuple[int, bool, List[str]]:
+    """Read one directory and return (flac_count, has_dotunderscore, subdirectories).
+
+    flac_count is the number of FLAC files without an Opus sibling, and
+    has_dotunderscore tells whether any macOS ._* metadata files are present.
+    Other hidden entries are ignored. Uses os.scandir so file
+    types come from the directory listing itself, without a stat call per
+    entry. Raises OSError if the directory cannot be read.
+    """
+    flac_bases = set()
+    opus_bases = set()
+    subdirs = []
+    has_dotunderscore = False
+    with os.scandir(directory) as it:
+        for entry in it:
+            name = entry.name
+            if name[0] == '.':
+                if name.startswith('._'):
+                    has_dotunderscore = True
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.path)
+                continue
+            # '.flac' and '.opus' are both 5 characters long
+            if _is_flac(name):
+                flac_bases.add(name[:-5])
+            elif name.endswith('.opus'):
+                opus_bases.add(name[:-5])
+    return len(flac_bases - opus_bases), has_dotunderscore, subdirs
+
+
+def _scan_albums(root: str) -> Iterator[Tuple[str, int, bool]]:
+    """Yield (directory, flac_count, has_dotunderscore) for every directory below root with FLAC files left to convert.
+
+    Albums whose FLAC files all have Opus versions are not reported. The root
+    itself is never reported as an album.
+    """
+    with os.scandir(root) as it:
+        stack = [e.path for e in it if e.name[0] != '.' and e.is_dir(follow_symlinks=False)]
+
+    while stack:
+        directory = stack.pop()
+        try:
+            flac_count, has_dotunderscore, subdirs = _scan_directory(directory)
+        except OSError:
+            # Unreadable directories are skipped
+            continue
+
+        if flac_count:
+            yield directory, flac_count, has_dotunderscore
+        stack.extend(subdirs)
+
+
+def _list_names(directory: str) -> Set[str]:
+    """Return the names of all entries in a directory using a single os.scandir."""
+    with os.scandir(directory) as it:
+        return {entry.name for entry in it}
+
+
+def _unlink_all(directory: str, names: List[str]) -> List[Optional[OSError]]:
+    """Delete several files from one directory.
+
+    The directory is opened once and every name is removed relative to that
+    descriptor. Returns one entry per name: None on success, otherwise the
+    OSError raised (the same error for every name if the directory cannot be
+    opened).
+    """
+    errors = []
+    if os.unlink in os.supports_dir_fd:
+        try:
+            dir_fd = os.open(directory, os.O_RDONLY)
+        except OSError as e:
+            return [e] * len(names)
+        try:
+            for name in names:
+                try:
+                    os.unlink(name, dir_fd=dir_fd)
+                    errors.append(None)
+                except OSError as e:
+                    errors.append(e)
+        finally:
+            os.close(dir_fd)
+    else:
+        for name in names:
+            try:
+                os.unlink(os.path.join(directory, name))
+                errors.append(None)
+            except OSError as e:
+                errors.append(e)
+    return errors
+
+
+def format_bytes(bytes_value: float) -> str:
+    """Format a byte count with a binary unit, e.g. '183.5 GB'."""
+    # Units are 2**10 apart, so the unit index is (bit length - 1) // 10
+    index = min((max(int(bytes_value), 1).bit_length() - 1) // 10, len(BYTE_UNITS) - 1)
+    return f"{bytes_value / 1024 ** index:.1f} {BYTE_UNITS[index]}"
+
 
 class FlacToOpusConverter:
-    def __init__(self, music_root: str):
+    def __init__(self, music_root: str, jobs: Optional[int] = None):
         self.music_root = Path(music_root)
         self.supported_formats = {'.flac'}
         self.opus_bitrate = '160k'
+        # opusenc is single-threaded, so concurrency comes from running one encoder per CPU
+        self.jobs = jobs or os.cpu_count() or 1
+        # Filled in once by check_opus_tools
+        self._opus_ok = None
+        self._opusenc_flags = ()
+        # Sorted album list, kept between "convert more albums" rounds
+        self._albums_cache = None
         
-    def find_albums_with_flac(self) -> List[Dict[str, any]]:
-        """Find all albums that contain FLAC files."""
-        albums_with_flac = []
+    def find_albums_with_flac(self) -> Iterator[Dict[str, any]]:
+        """Yield every album that contains FLAC files, in scan order.
+        
+        Album dicts only hold the album path, its display path and FLAC count;
+        the file list is read later by plan_album for albums that get selected.
+        """
+        root = str(self.music_root)
+        # Adds a separator only when root does not already end with one, e.g. "/"
+        prefix_len = len(os.path.join(root, ''))
         
         print(f"Scanning for albums with FLAC files in {self.music_root}")
         
-        for root, dirs, files in os.walk(self.music_root):
-            # Skip the root directory itself
-            if root == str(self.music_root):
-                continue
-                
-            root_path = Path(root)
-            flac_files = [f for f in files if f.lower().endswith('.flac')]
-            
-            if flac_files:
-                # Calculate relative path from music root
-                relative_path = root_path.relative_to(self.music_root)
-                
-                albums_with_flac.append({
-                    'path': root_path,
-                    'relative_path': str(relative_path),
-                    'flac_count': len(flac_files),
-                    'flac_files': flac_files,
-                    'total_files': len(files)
-                })
-        
-        return sorted(albums_with_flac, key=lambda x: x['relative_path'])
+        for directory, flac_count, has_dotunderscore in _scan_albums(root):
+            yield {
+                'path': directory,
+                'relative_path': directory[prefix_len:],
+                'flac_count': flac_count,
+                'has_dotunderscore': has_dotunderscore
+            }
     
     def get_disk_space_info(self) -> Dict[str, str]:
         """Get disk space information for the music directory."""
@@ -54,13 +334,6 @@ class FlacToOpusConverter:
             total_bytes, used_bytes, free_bytes = shutil.disk_usage(str(self.music_root))
             
             # Convert to human readable format
-            def format_bytes(bytes_value):
-                for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-                    if bytes_value < 1024.0:
-                        return f"{bytes_value:.1f} {unit}"
-                    bytes_value /= 1024.0
-                return f"{bytes_value:.1f} PB"
-            
             return {
                 'total': format_bytes(total_bytes),
                 'used': format_bytes(used_bytes),
@@ -116,6 +389,29 @@ class FlacToOpusConverter:
         # Display disk space information after the album list
         self.display_disk_space()
     
+    @staticmethod
+    def parse_selection(selection: str, count: int) -> List[int]:
+        """Parse a selection like '1,3-7,10' into sorted 1-based album numbers.
+        
+        Raises ValueError on malformed or out-of-range input.
+        """
+        parts = []
+        for part in selection.split(','):
+            match = SELECTION_PART.fullmatch(part)
+            if not match:
+                raise ValueError(f"'{part.strip()}' is not a number or range")
+            
+            start = int(match.group(1))
+            end = int(match.group(2)) if match.group(2) else start
+            if start > end:
+                raise ValueError(f"range '{part.strip()}' is reversed")
+            if start < 1 or end > count:
+                raise ValueError(f"'{part.strip()}' is outside 1-{count}")
+            
+            parts.append(range(start, end + 1))
+        
+        return sorted(set(itertools.chain.from_iterable(parts)))
+    
     def get_user_selection(self, albums: List[Dict[str, any]]) -> List[Dict[str, any]]:
         """Get user selection of albums to convert."""
         if not albums:
@@ -135,27 +431,8 @@ class FlacToOpusConverter:
                 if not selection:
                     continue
                 
-                selected_indices = set()
-                
-                # Parse selection
-                for part in selection.split(','):
-                    part = part.strip()
-                    if '-' in part:
-                        # Range selection
-                        start, end = map(int, part.split('-'))
-                        selected_indices.update(range(start, end + 1))
-                    else:
-                        # Single selection
-                        selected_indices.add(int(part))
-                
-                # Validate indices
-                valid_indices = {i for i in selected_indices if 1 <= i <= len(albums)}
-                if len(valid_indices) != len(selected_indices):
-                    invalid = selected_indices - valid_indices
-                    print(f"Invalid selections: {invalid}")
-                    continue
-                
-                selected_albums = [albums[i-1] for i in sorted(valid_indices)]
+                selected_indices = self.parse_selection(selection, len(albums))
+                selected_albums = [albums[i-1] for i in selected_indices]
                 
                 # Confirm selection
                 print(f"\nSelected {len(selected_albums)} albums:")
@@ -169,7 +446,7 @@ class FlacToOpusConverter:
                 else:
                     return selected_albums
                     
-            except (ValueError, IndexError) as e:
+            except ValueError as e:
                 print(f"Invalid input: {e}")
                 continue
             except KeyboardInterrupt:
@@ -177,53 +454,53 @@ class FlacToOpusConverter:
                 return []
     
     def check_opus_tools(self) -> bool:
-        """Check if opus-tools (opusenc) is available."""
+        """Check if opus-tools (opusenc) is available.
+        
+        The result is cached for the session. The first successful check also
+        probes which optional opusenc flags (--quiet, --music) are supported,
+        so encodes can use them without re-checking.
+        """
+        if self._opus_ok is not None:
+            return self._opus_ok
+        
         try:
             result = subprocess.run(['opusenc', '--version'], 
                                   capture_output=True, text=True, check=True)
             print(f"Found opus encoder: {result.stdout.strip().split()[0]}")
-            return True
+            self._opus_ok = True
         except (subprocess.CalledProcessError, FileNotFoundError):
             print("Error: opusenc not found. Please install opus-tools:")
             print("  macOS: brew install opus-tools")
             print("  Ubuntu/Debian: sudo apt install opus-tools")
             print("  Other: Check your package manager or download from opus-codec.org")
+            self._opus_ok = False
             return False
-    
-    def convert_flac_to_opus(self, flac_path: Path, opus_path: Path) -> bool:
-        """Convert a single FLAC file to Opus format."""
+        
+        # Older opusenc builds may lack some options; only use what --help lists
         try:
-            cmd = [
-                'opusenc',
-                '--bitrate', self.opus_bitrate,
-                str(flac_path),
-                str(opus_path)
-            ]
-            
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            return True
-            
-        except subprocess.CalledProcessError as e:
-            print(f"Error converting {flac_path.name}: {e.stderr}")
-            return False
-        except Exception as e:
-            print(f"Unexpected error converting {flac_path.name}: {e}")
-            return False
+            result = subprocess.run(['opusenc', '--help'], capture_output=True, text=True)
+            usage = result.stdout + result.stderr
+            self._opusenc_flags = tuple(flag for flag in ('--quiet', '--music') if flag in usage)
+        except OSError:
+            self._opusenc_flags = ()
+        
+        return True
     
-    def handle_existing_opus_files(self, album: Dict[str, any]) -> List[Path]:
-        """Handle FLAC files that already have corresponding Opus files."""
-        album_path = album['path']
-        flac_files = album['flac_files']
+    def handle_existing_opus_files(self, album: Dict[str, any],
+                                   existing_names: Optional[Set[str]] = None) -> List[str]:
+        """Handle FLAC files that already have corresponding Opus files.
+        
+        existing_names is the set of file names in the album directory; it is
+        read with a single os.scandir when not provided. Returns the names of
+        the deleted FLAC files.
+        """
+        album_str = album['path']
+        if existing_names is None:
+            existing_names = _list_names(album_str)
         
         # Find FLAC files that have corresponding Opus files
-        flac_with_opus = []
-        for flac_file in flac_files:
-            flac_path = album_path / flac_file
-            opus_file = flac_file.rsplit('.', 1)[0] + '.opus'
-            opus_path = album_path / opus_file
-            
-            if opus_path.exists():
-                flac_with_opus.append(flac_path)
+        # (the scanner guarantees a 5-character .flac extension)
+        flac_with_opus = [f for f in album['flac_files'] if f[:-5] + '.opus' in existing_names]
         
         if flac_with_opus:
             print(f"  Found {len(flac_with_opus)} FLAC files with existing Opus versions")
@@ -232,25 +509,23 @@ class FlacToOpusConverter:
                 delete_choice = input().strip().lower()
                 if delete_choice not in ['n', 'no']:
                     deleted_files = []
-                    for flac_path in flac_with_opus:
-                        try:
-                            flac_path.unlink()
-                            print(f"    Deleted: {flac_path.name}")
-                            deleted_files.append(flac_path)
-                        except Exception as e:
-                            print(f"    Error deleting {flac_path.name}: {e}")
+                    errors = _unlink_all(album_str, flac_with_opus)
+                    for flac_file, error in zip(flac_with_opus, errors):
+                        if error is None:
+                            print(f"    Deleted: {flac_file}")
+                            deleted_files.append(flac_file)
+                        else:
+                            print(f"    Error deleting {flac_file}: {error}")
                     
                     # Clean up macOS metadata files for deleted FLAC files
-                    if deleted_files:
+                    metadata_names = [f"._{flac_file}" for flac_file in deleted_files
+                                      if f"._{flac_file}" in existing_names]
+                    if metadata_names:
                         print("    Cleaning up macOS metadata files...")
-                        for flac_path in deleted_files:
-                            metadata_file = album_path / f"._{flac_path.name}"
-                            if metadata_file.exists():
-                                try:
-                                    metadata_file.unlink()
-                                    print(f"      Deleted: {metadata_file.name}")
-                                except Exception:
-                                    pass
+                        errors = _unlink_all(album_str, metadata_names)
+                        for metadata_name, error in zip(metadata_names, errors):
+                            if error is None:
+                                print(f"      Deleted: {metadata_name}")
                     
                     return deleted_files
             except KeyboardInterrupt:
@@ -258,57 +533,46 @@ class FlacToOpusConverter:
         
         return []
 
-    def convert_album(self, album: Dict[str, any]) -> bool:
-        """Convert all FLAC files in an album to Opus format."""
-        album_path = album['path']
-        flac_files = album['flac_files']
-        
-        print(f"\nProcessing: {album['relative_path']}")
+    def plan_album(self, album: Dict[str, any]) -> List[Tuple[str, str, str]]:
+        """Return (flac_file, flac_path, opus_path) for each file that still needs converting in an album."""
+        album_str = album['path']
+        sep = os.sep
         
-        # Handle existing Opus files first
-        deleted_flac_files = self.handle_existing_opus_files(album)
+        print(f"Processing: {album['relative_path']}")
         
-        print(f"Converting {len(flac_files)} FLAC files to Opus...")
+        # Deleting FLACs below does not change which Opus files exist
+        existing_names = _list_names(album_str)
+        album['flac_files'] = sorted(
+            name for name in existing_names if name[0] != '.' and _is_flac(name)
+        )
         
-        successful_conversions = []
-        failed_conversions = []
+        # Handle existing Opus files first
+        self.handle_existing_opus_files(album, existing_names)
         
-        # Convert files with thread pool for better performance
-        with ThreadPoolExecutor(max_workers=4) as executor:
-            future_to_file = {}
+        pending = []
+        for flac_file in album['flac_files']:
+            opus_file = flac_file[:-5] + '.opus'
             
-            for flac_file in flac_files:
-                flac_path = album_path / flac_file
-                opus_file = flac_file.rsplit('.', 1)[0] + '.opus'
-                opus_path = album_path / opus_file
-                
-                # Skip if opus file already exists
-                if opus_path.exists():
-                    print(f"  Skipping {flac_file} (Opus version exists)")
-                    continue
-                
-                future = executor.submit(self.convert_flac_to_opus, flac_path, opus_path)
-                future_to_file[future] = (flac_file, flac_path, opus_path)
+            # Skip if opus file already exists
+            if opus_file in existing_names:
+                print(f"  Skipping {flac_file} (Opus version exists)")
+                continue
             
-            # Process completed conversions
-            for future in as_completed(future_to_file):
-                flac_file, flac_path, opus_path = future_to_file[future]
-                
-                try:
-                    success = future.result()
-                    if success and opus_path.exists():
-                        print(f"  ✓ Converted: {flac_file}")
-                        successful_conversions.append(flac_path)
-                    else:
-                        print(f"  ✗ Failed: {flac_file}")
-                        failed_conversions.append(flac_path)
-                        
-                except Exception as e:
-                    print(f"  ✗ Error: {flac_file} - {e}")
-                    failed_conversions.append(flac_path)
+            pending.append((flac_file, f"{album_str}{sep}{flac_file}", f"{album_str}{sep}{opus_file}"))
+        
+        print(f"  Queued {len(pending)} FLAC files for conversion")
+        return pending
+    
+    def finalize_album(self, album: Dict[str, any], successful_conversions: List[str],
+                       failed_conversions: List[str]) -> bool:
+        """Report results for a converted album and clean up its FLAC files.
+        
+        Conversions are given as FLAC file names relative to the album directory.
+        """
+        album_path = album['path']
         
         # Report results
-        total_files = len(flac_files)
+        total_files = len(album['flac_files'])
         skipped = total_files - len(successful_conversions) - len(failed_conversions)
         
         print(f"  Results: {len(successful_conversions)} converted, {len(failed_conversions)} failed, {skipped} skipped")
@@ -316,22 +580,29 @@ class FlacToOpusConverter:
         # Delete FLAC files if all conversions were successful
         if successful_conversions and not failed_conversions:
             print("  Deleting original FLAC files...")
-            for flac_path in successful_conversions:
-                try:
-                    flac_path.unlink()
-                    print(f"    Deleted: {flac_path.name}")
-                except Exception as e:
-                    print(f"    Error deleting {flac_path.name}: {e}")
+            errors = _unlink_all(album_path, successful_conversions)
+            for flac_file, error in zip(successful_conversions, errors):
+                if error is None:
+                    print(f"    Deleted: {flac_file}")
+                else:
+                    print(f"    Error deleting {flac_file}: {error}")
             
-            # Delete macOS metadata files (._* pattern)
-            print("  Cleaning up macOS metadata files...")
-            metadata_files = list(album_path.glob("._*"))
-            for metadata_file in metadata_files:
+            # Delete macOS metadata files (._* pattern), skipping the directory
+            # read entirely for albums where the scan saw none
+            if album.get('has_dotunderscore'):
+                print("  Cleaning up macOS metadata files...")
                 try:
-                    metadata_file.unlink()
-                    print(f"    Deleted: {metadata_file.name}")
-                except Exception as e:
-                    print(f"    Error deleting {metadata_file.name}: {e}")
+                    metadata_names = [name for name in _list_names(album_path) if name.startswith('._')]
+                except OSError as e:
+                    print(f"    Error reading {album['relative_path']}: {e}")
+                    metadata_names = []
+                errors = _unlink_all(album_path, metadata_names)
+                for metadata_name, error in zip(metadata_names, errors):
+                    if error is None:
+                        print(f"    Deleted: {metadata_name}")
+                    else:
+                        print(f"    Error deleting {metadata_name}: {error}")
+                album['has_dotunderscore'] = False
             
             return True
         elif failed_conversions:
@@ -341,6 +612,156 @@ class FlacToOpusConverter:
             print("  No new conversions needed")
             return True
     
+    def convert_albums(self, albums: List[Dict[str, any]]) -> int:
+        """Convert all selected albums, encoding files from every album concurrently.
+        
+        Files from every album are scheduled together so that the tail of one
+        album overlaps the head of the next. Each album is finalized as soon as
+        its last file completes. Returns the number of successful albums.
+        """
+        total_albums = len(albums)
+        
+        # Plan every album up-front (interactive handling of existing Opus files)
+        plans = []
+        for i, album in enumerate(albums, 1):
+            print(f"\n[{i}/{total_albums}]", end=" ")
+            plans.append(self.plan_album(album))
+        
+        return asyncio.run(self._convert_albums_async(albums, plans))
+    
+    async def _convert_albums_async(self, albums: List[Dict[str, any]],
+                                    plans: List[List[Tuple[str, str, str]]]) -> int:
+        """Encode the planned files of all albums and finalize each album as it completes.
+        
+        At most self.jobs opusenc processes run at once.
+        """
+        total_albums = len(albums)
+        # Per-album bookkeeping in lists indexed like albums and plans
+        remaining = [len(pairs) for pairs in plans]
+        successful_conversions = [[] for _ in plans]
+        failed_conversions = [[] for _ in plans]
+        successful_albums = 0
+        
+        # Albums with nothing left to convert can be finalized right away
+        for i, pairs in enumerate(plans):
+            if not pairs:
+                print(f"\n[{i + 1}/{total_albums}] Finished: {albums[i]['relative_path']}")
+                if self.finalize_album(albums[i], [], []):
+                    successful_albums += 1
+        
+        total_files = sum(remaining)
+        if not total_files:
+            return successful_albums
+        
+        print(f"\nConverting {total_files} FLAC files to Opus ({self.jobs} parallel jobs)...")
+        
+        semaphore = asyncio.Semaphore(self.jobs)
+        
+        async def encode(i, flac_file, flac_path, opus_path):
+            async with semaphore:
+                success, error = await _encode_one(flac_path, opus_path, self.opus_bitrate,
+                                                   self._opusenc_flags)
+            return i, flac_file, success, error
+        
+        pending = [encode(i, *pair) for i, pairs in enumerate(plans) for pair in pairs]
+        
+        # Process completed conversions
+        for next_done in asyncio.as_completed(pending):
+            i, flac_file, success, error = await next_done
+            label = f"[{i + 1}/{total_albums}]"
+            
+            # A successful encode is only reported once the Opus file is in place
+            if success:
+                print(f"  {label} ✓ Converted: {flac_file}")
+                successful_conversions[i].append(flac_file)
+            else:
+                if error:
+                    print(f"  {label} Error converting {flac_file}: {error}")
+                print(f"  {label} ✗ Failed: {flac_file}")
+                failed_conversions[i].append(flac_file)
+            
+            # Reconcile the album once its last file is done
+            remaining[i] -= 1
+            if remaining[i] == 0:
+                print(f"\n{label} Finished: {albums[i]['relative_path']}")
+                if self.finalize_album(albums[i], successful_conversions[i], failed_conversions[i]):
+                    successful_albums += 1
+        
+        return successful_albums
+    
+    def _estimate_output_bytes(self, album: Dict[str, any]) -> int:
+        """Estimate the size of the Opus files an album will produce.
+        
+        Sums the sizes of FLAC files without an Opus version, which costs one
+        stat call per FLAC file.
+        """
+        flac_sizes = {}
+        opus_bases = set()
+        with os.scandir(album['path']) as it:
+            for entry in it:
+                name = entry.name
+                if name[0] == '.':
+                    continue
+                if _is_flac(name):
+                    flac_sizes[name[:-5]] = entry.stat().st_size
+                elif name.endswith('.opus'):
+                    opus_bases.add(name[:-5])
+        
+        flac_bytes = sum(size for base, size in flac_sizes.items() if base not in opus_bases)
+        return int(flac_bytes * OPUS_SIZE_RATIO)
+    
+    def confirm_free_space(self, albums: List[Dict[str, any]]) -> bool:
+        """Warn before converting if the estimated Opus output may not fit on disk.
+        
+        Returns False if the user chooses not to proceed.
+        """
+        try:
+            free_bytes = shutil.disk_usage(str(self.music_root)).free
+            needed_bytes = sum(self._estimate_output_bytes(album) for album in albums)
+        except OSError:
+            # Without an estimate, let the conversion proceed as before
+            return True
+        
+        if needed_bytes <= free_bytes * 0.9:
+            return True
+        
+        print(f"\n⚠️  The selected albums need about {format_bytes(needed_bytes)} for Opus files, "
+              f"but only {format_bytes(free_bytes)} is free.")
+        print("  FLAC files are only deleted once each album finishes converting.")
+        try:
+            choice = input("  Continue anyway? (y/N): ").strip().lower()
+        except KeyboardInterrupt:
+            print("\nOperation cancelled.")
+            return False
+        return choice in ['y', 'yes']
+    
+    def get_albums(self) -> List[Dict[str, any]]:
+        """Return the sorted album list, scanning the music tree only on first use."""
+        if self._albums_cache is None:
+            self._albums_cache = sorted(self.find_albums_with_flac(), key=lambda x: x['relative_path'])
+        return self._albums_cache
+    
+    def refresh_albums(self, touched_albums: List[Dict[str, any]]) -> None:
+        """Update the cached album list after converting some albums.
+        
+        Only the touched album directories are re-read; albums with no FLAC
+        files left to convert are dropped from the cache.
+        """
+        if self._albums_cache is None:
+            return
+        
+        for album in touched_albums:
+            try:
+                flac_count, has_dotunderscore, _ = _scan_directory(album['path'])
+            except OSError:
+                flac_count, has_dotunderscore = 0, False
+            album['flac_count'] = flac_count
+            album['has_dotunderscore'] = has_dotunderscore
+            # Resolved again by plan_album if the album is picked a second time
+            album.pop('flac_files', None)
+        
+        self._albums_cache = [album for album in self._albums_cache if album['flac_count']]
+    
     def run(self) -> None:
         """Main execution flow."""
         print("FLAC to Opus Album Converter")
@@ -350,32 +771,48 @@ class FlacToOpusConverter:
         if not self.check_opus_tools():
             sys.exit(1)
         
+        while self._run_once():
+            # Ask if user wants to continue with more conversions
+            print(f"\nWould you like to convert more albums? (Y/n): ", end="")
+            try:
+                continue_choice = input().strip().lower()
+                if continue_choice in ['n', 'no']:
+                    break
+                print("\nRestarting conversion process...")
+            except KeyboardInterrupt:
+                print("\nOperation cancelled.")
+                break
+    
+    def _run_once(self) -> bool:
+        """Select and convert one batch of albums.
+        
+        Returns True if a conversion ran and the user may be offered another.
+        """
         # Find albums with FLAC files
-        albums = self.find_albums_with_flac()
+        albums = self.get_albums()
         
         if not albums:
             print("No albums with FLAC files found!")
-            return
+            return False
         
         # Get user selection
         selected_albums = self.get_user_selection(albums)
         
         if not selected_albums:
             print("No albums selected. Exiting.")
-            return
+            return False
+        
+        if not self.confirm_free_space(selected_albums):
+            print("Conversion cancelled.")
+            return True
         
         # Process selected albums
         print(f"\n{'='*60}")
         print("STARTING CONVERSION PROCESS")
         print(f"{'='*60}")
         
-        successful_albums = 0
-        
-        for i, album in enumerate(selected_albums, 1):
-            print(f"\n[{i}/{len(selected_albums)}]", end=" ")
-            
-            if self.convert_album(album):
-                successful_albums += 1
+        successful_albums = self.convert_albums(selected_albums)
+        self.refresh_albums(selected_albums)
         
         # Final summary
         print(f"\n{'='*60}")
@@ -388,22 +825,25 @@ class FlacToOpusConverter:
         
         # Display disk space after conversion
         self.display_disk_space()
-        
-        # Ask if user wants to continue with more conversions
-        print(f"\nWould you like to convert more albums? (Y/n): ", end="")
-        try:
-            continue_choice = input().strip().lower()
-            if continue_choice not in ['n', 'no']:
-                print("\nRestarting conversion process...")
-                self.run()
-        except KeyboardInterrupt:
-            print("\nOperation cancelled.")
+        return True
+
+
+def positive_int(value: str) -> int:
+    """Argparse type for strictly positive integers."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
 
 
 def main():
     """Entry point for the script."""
     parser = argparse.ArgumentParser(description='Convert FLAC files to Opus format')
     parser.add_argument('music_root', help='Root directory containing music albums')
+    parser.add_argument('-j', '--jobs', type=positive_int, default=os.cpu_count(),
+                        help='Number of files to encode in parallel (default: number of CPUs). '
+                             'Each opusenc process uses a single core, so going above the CPU '
+                             'count only adds contention.')
     
     args = parser.parse_args()
     
@@ -418,7 +858,7 @@ def main():
         sys.exit(1)
     
     try:
-        converter = FlacToOpusConverter(str(music_path.resolve()))
+        converter = FlacToOpusConverter(str(music_path.resolve()), jobs=args.jobs)
         converter.run()
     except KeyboardInterrupt:
         print("\n\nOperation cancelled by user.")